@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from collections.abc import Callable, Sequence
+from collections.abc import Callable, Mapping, Sequence
 from datetime import timedelta
 from typing import Any
 from urllib.parse import quote as urlquote
@@ -183,24 +183,28 @@ class OrganizationEventsEndpointBase(OrganizationEndpoint):
             return orderby
         return None
 
-    def quantize_date_params(self, request: Request, params: dict[str, Any]) -> dict[str, Any]:
+    def should_quantize_date_params(self, request: Request, params: Mapping[str, Any]) -> bool:
         # We only need to perform this rounding on relative date periods
         if "statsPeriod" not in request.GET:
+            return False
+        # Only perform rounding on durations longer than an hour
+        return (params["end"] - params["start"]).total_seconds() > 3600
+
+    def quantize_date_params(self, request: Request, params: dict[str, Any]) -> dict[str, Any]:
+        if not self.should_quantize_date_params(request, params):
             return params
         results = params.copy()
         duration = (params["end"] - params["start"]).total_seconds()
-        # Only perform rounding on durations longer than an hour
-        if duration > 3600:
-            # Round to 15 minutes if over 30 days, otherwise round to the minute
-            round_to = 15 * 60 if duration >= 30 * 24 * 3600 else 60
-            key = params.get("organization_id", 0)
+        # Round to 15 minutes if over 30 days, otherwise round to the minute
+        round_to = 15 * 60 if duration >= 30 * 24 * 3600 else 60
+        key = params.get("organization_id", 0)
 
-            results["start"] = snuba.quantize_time(
-                params["start"], key, duration=round_to, rounding=snuba.ROUND_DOWN
-            )
-            results["end"] = snuba.quantize_time(
-                params["end"], key, duration=round_to, rounding=snuba.ROUND_UP
-            )
+        results["start"] = snuba.quantize_time(
+            params["start"], key, duration=round_to, rounding=snuba.ROUND_DOWN
+        )
+        results["end"] = snuba.quantize_time(
+            params["end"], key, duration=round_to, rounding=snuba.ROUND_UP
+        )
         return results
 
 
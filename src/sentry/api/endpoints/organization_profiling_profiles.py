@@ -1,7 +1,10 @@
+import re
+from datetime import datetime
+from typing import Any
+
 import sentry_sdk
-from django.http import HttpResponse
-from rest_framework import serializers
-from rest_framework.exceptions import ParseError
+from django.http import HttpResponse, QueryDict
+from rest_framework.exceptions import ErrorDetail, ParseError
 from rest_framework.request import Request
 from rest_framework.response import Response
 
@@ -14,6 +17,7 @@ from sentry.api.utils import handle_query_errors
 from sentry.models.organization import Organization
 from sentry.profiles.flamegraph import (
     FlamegraphExecutor,
+    ProfileIds,
     get_chunks_from_spans_metadata,
     get_profile_ids,
     get_profiles_with_function,
@@ -21,7 +25,11 @@ from sentry.profiles.flamegraph import (
 )
 from sentry.profiles.profile_chunks import get_chunk_ids
 from sentry.profiles.utils import proxy_profiling_service
+from sentry.search.events.types import ParamsType
 from sentry.snuba.dataset import Dataset
+from sentry.utils.cache import cache
+from sentry.utils.dates import to_timestamp_ns
+from sentry.utils.hashlib import hash_values
 
 
 class OrganizationProfilingBaseEndpoint(OrganizationEventsV2EndpointBase):
@@ -31,30 +39,159 @@ class OrganizationProfilingBaseEndpoint(OrganizationEventsV2EndpointBase):
     }
 
 
-class OrganizationProfilingFlamegraphSerializer(serializers.Serializer):
-    # fingerprint is an UInt32
-    fingerprint = serializers.IntegerField(min_value=0, max_value=(1 << 32) - 1, required=False)
-    dataset = serializers.ChoiceField(["profiles", "discover", "functions"], required=False)
-    query = serializers.CharField(required=False)
+def _has_compat_feature(request: Request, organization: Organization) -> bool:
+    """
+    Resolves the flagpole backed compat flag with `features.batch_has`, which
+    consults the entity handler directly, falling back to `features.has` when
+    the batch leaves it unhandled.
+    """
+    flag = "organizations:continuous-profiling-compat"
+    batch = features.batch_has([flag], actor=request.user, organization=organization)
+    result = (batch or {}).get(f"organization:{organization.id}", {}).get(flag)
+    if result is None:
+        return features.has(flag, organization, actor=request.user)
+    return result
+
+
+# seconds to cache the profile ids backing a flamegraph
+PROFILE_IDS_CACHE_TTL = 15
+
+
+# every param the profile ids query reads, including the user and teams which
+# resolve filters like `team_key_transaction`
+PROFILE_IDS_CACHE_PARAMS = (
+    "start",
+    "end",
+    "project_id",
+    "environment",
+    "organization_id",
+    "user_id",
+    "team_id",
+)
 
-    def validate(self, attrs):
-        dataset = attrs.get("dataset")
 
-        if dataset is None:
-            if attrs.get("fingerprint") is not None:
-                attrs["dataset"] = Dataset.Functions
+def _normalize_cache_param(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (list, set)):
+        return sorted(value)
+    return value
+
+
+def get_cached_profile_ids(
+    organization: Organization,
+    params: ParamsType,
+    query: str | None,
+    quantized: bool,
+) -> ProfileIds:
+    """
+    Caches the profile ids for a short while so dashboards polling the same
+    flamegraph do not repeat the snuba query. Only quantized date params are
+    cached, otherwise the key would never be reused.
+    """
+    if not quantized:
+        return get_profile_ids(params, query)
+
+    cache_params = {
+        key: _normalize_cache_param(params.get(key)) for key in PROFILE_IDS_CACHE_PARAMS
+    }
+    params_hash = hash_values([cache_params, query or ""])
+    cache_key = f"profiling-flamegraph-profile-ids:{organization.id}:{params_hash}"
+    profile_ids = cache.get(cache_key)
+
+    # cache miss, need to make the query again
+    if profile_ids is None:
+        profile_ids = get_profile_ids(params, query)
+        cache.set(cache_key, profile_ids, PROFILE_IDS_CACHE_TTL)
+
+    return profile_ids
+
+
+FLAMEGRAPH_DATASETS = {"profiles", "discover", "functions"}
+# fingerprint is an UInt32
+FINGERPRINT_MAX = (1 << 32) - 1
+# integers like `5.0` are accepted, same as DRF's IntegerField
+TRAILING_ZERO_DECIMAL_RE = re.compile(r"\.0*\s*$")
+# longest fingerprint string parsed, same as DRF's IntegerField
+MAX_INTEGER_STRING_LENGTH = 1000
+
+
+def validate_flamegraph_params(
+    data: QueryDict,
+) -> tuple[dict[str, Any], dict[str, list[ErrorDetail]]]:
+    """
+    Validates the flamegraph query params by hand as a cheaper stand in for a
+    serializer on this hot path. Returns the validated params along with any
+    field errors, mirroring the shape of `serializer.errors`.
+    """
+    attrs: dict[str, Any] = {}
+    errors: dict[str, list[ErrorDetail]] = {}
+
+    fingerprint = data.get("fingerprint")
+    if fingerprint:
+        fingerprint = fingerprint.strip()
+        if len(fingerprint) > MAX_INTEGER_STRING_LENGTH:
+            errors["fingerprint"] = [
+                ErrorDetail("String value too large.", code="max_string_length")
+            ]
+        else:
+            try:
+                attrs["fingerprint"] = int(TRAILING_ZERO_DECIMAL_RE.sub("", fingerprint))
+            except ValueError:
+                errors["fingerprint"] = [
+                    ErrorDetail("A valid integer is required.", code="invalid")
+                ]
             else:
-                attrs["dataset"] = Dataset.Discover
-        elif dataset == "functions":
+                if attrs["fingerprint"] < 0:
+                    errors["fingerprint"] = [
+                        ErrorDetail(
+                            "Ensure this value is greater than or equal to 0.", code="min_value"
+                        )
+                    ]
+                elif attrs["fingerprint"] > FINGERPRINT_MAX:
+                    errors["fingerprint"] = [
+                        ErrorDetail(
+                            f"Ensure this value is less than or equal to {FINGERPRINT_MAX}.",
+                            code="max_value",
+                        )
+                    ]
+
+    dataset = data.get("dataset")
+    if dataset:
+        if dataset not in FLAMEGRAPH_DATASETS:
+            errors["dataset"] = [
+                ErrorDetail(f'"{dataset}" is not a valid choice.', code="invalid_choice")
+            ]
+    else:
+        dataset = None
+
+    query = data.get("query")
+    if query:
+        query = query.strip()
+        if not query:
+            errors["query"] = [ErrorDetail("This field may not be blank.", code="blank")]
+        elif "\x00" in query:
+            errors["query"] = [
+                ErrorDetail("Null characters are not allowed.", code="null_characters_not_allowed")
+            ]
+        attrs["query"] = query
+
+    if errors:
+        return attrs, errors
+
+    if dataset is None:
+        if attrs.get("fingerprint") is not None:
             attrs["dataset"] = Dataset.Functions
-        elif attrs.get("fingerprint") is not None:
-            raise ParseError(
-                detail='"fingerprint" is only permitted when using dataset: "functions"'
-            )
         else:
             attrs["dataset"] = Dataset.Discover
+    elif dataset == "functions":
+        attrs["dataset"] = Dataset.Functions
+    elif attrs.get("fingerprint") is not None:
+        raise ParseError(detail='"fingerprint" is only permitted when using dataset: "functions"')
+    else:
+        attrs["dataset"] = Dataset.Discover
 
-        return attrs
+    return attrs, errors
 
 
 @region_silo_endpoint
@@ -63,9 +200,11 @@ class OrganizationProfilingFlamegraphEndpoint(OrganizationProfilingBaseEndpoint)
         if not features.has("organizations:profiling", organization, actor=request.user):
             return Response(status=404)
 
-        if request.GET.get("compat") != "1" or not features.has(
-            "organizations:continuous-profiling-compat", organization, actor=request.user
-        ):
+        if request.GET.get("compat") != "1" or not _has_compat_feature(request, organization):
+            # reject explicit multi project requests before resolving the snuba params
+            if len(set(request.GET.getlist("project"))) > 1:
+                raise ParseError(detail="You cannot get a flamegraph from multiple projects.")
+
             params = self.get_snuba_params(request, organization)
             project_ids = params["project_id"]
             if len(project_ids) > 1:
@@ -84,7 +223,12 @@ class OrganizationProfilingFlamegraphEndpoint(OrganizationProfilingBaseEndpoint)
                 )
             else:
                 sentry_sdk.set_tag("dataset", "profiles")
-                profile_ids = get_profile_ids(params, request.query_params.get("query", None))
+                profile_ids = get_cached_profile_ids(
+                    organization,
+                    params,
+                    request.query_params.get("query", None),
+                    quantized=self.should_quantize_date_params(request, params),
+                )
 
             return proxy_profiling_service(
                 method="POST",
@@ -97,10 +241,9 @@ class OrganizationProfilingFlamegraphEndpoint(OrganizationProfilingBaseEndpoint)
         except NoProjects:
             return Response(status=404)
 
-        serializer = OrganizationProfilingFlamegraphSerializer(data=request.GET)
-        if not serializer.is_valid():
-            return Response(serializer.errors, status=400)
-        serialized = serializer.validated_data
+        serialized, errors = validate_flamegraph_params(request.GET)
+        if errors:
+            return Response(errors, status=400)
 
         with handle_query_errors():
             executor = FlamegraphExecutor(
@@ -143,8 +286,8 @@ class OrganizationProfilingChunksEndpoint(OrganizationProfilingBaseEndpoint):
             json_data={
                 "profiler_id": profiler_id,
                 "chunk_ids": chunk_ids,
-                "start": str(int(params["start"].timestamp() * 1e9)),
-                "end": str(int(params["end"].timestamp() * 1e9)),
+                "start": str(to_timestamp_ns(params["start"])),
+                "end": str(to_timestamp_ns(params["end"])),
             },
         )
 
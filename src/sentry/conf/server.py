@@ -3143,6 +3143,8 @@ SEER_AUTOFIX_FORCE_USE_REPOS: list[dict] = []
 
 # This is the URL to the profiling service
 SENTRY_VROOM = os.getenv("VROOM", "http://127.0.0.1:8085")
+# Number of connections kept alive per process to the profiling service
+SENTRY_VROOM_POOL_MAXSIZE = 64
 
 SENTRY_REPLAYS_SERVICE_URL = "http://localhost:8090"
 
@@ -2620,6 +2620,14 @@ register(
     flags=FLAG_AUTOMATOR_MODIFIABLE,
 )
 
+# Serialize payloads sent to the profiling service with orjson
+register(
+    "profiling.profiling-service.use-orjson",
+    type=Bool,
+    default=False,
+    flags=FLAG_AUTOMATOR_MODIFIABLE,
+)
+
 # Enable orjson in the occurrence_consumer.process_[message|batch]
 register(
     "issues.occurrence_consumer.use_orjson",
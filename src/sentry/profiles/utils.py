@@ -1,9 +1,12 @@
+import re
 from datetime import datetime
+from functools import lru_cache
 from types import TracebackType
 from typing import Any, Self
 from urllib.parse import urlencode, urlparse
 
 import brotli
+import orjson
 import sentry_sdk
 import urllib3
 from django.conf import settings
@@ -12,6 +15,7 @@ from parsimonious.exceptions import ParseError
 from urllib3.connectionpool import ConnectionPool
 from urllib3.response import HTTPResponse as VroomResponse
 
+from sentry import options
 from sentry.api.event_search import SearchFilter, parse_search_query
 from sentry.exceptions import InvalidSearchQuery
 from sentry.net.http import connection_from_url
@@ -19,6 +23,20 @@ from sentry.utils import json, metrics
 from sentry.utils.sdk import set_measurement
 
 
+@lru_cache(maxsize=128)
+def _normalize_path(url: str) -> str:
+    # The url is high cardinality because of the ids in it, so strip it
+    # from the path before using it in the metric tags.
+    parts = urlparse(url).path.split("/")
+    if len(parts) > 2:
+        parts[2] = ":orgId"
+    if len(parts) > 4:
+        parts[4] = ":projId"
+    if len(parts) > 6:
+        parts[6] = ":uuid"
+    return "/".join(parts)
+
+
 class RetrySkipTimeout(urllib3.Retry):
     """
     urllib3 Retry class does not allow us to retry on read errors but to exclude
@@ -39,20 +57,7 @@ class RetrySkipTimeout(urllib3.Retry):
         immediately give up. Except when we're inserting a profile to vroom which
         can timeout due to GCS where we want to retry.
         """
-        if url:
-            # The url is high cardinality because of the ids in it, so strip it
-            # from the path before using it in the metric tags.
-            path = urlparse(url).path
-            parts = path.split("/")
-            if len(parts) > 2:
-                parts[2] = ":orgId"
-            if len(parts) > 4:
-                parts[4] = ":projId"
-            if len(parts) > 6:
-                parts[6] = ":uuid"
-            path = "/".join(parts)
-        else:
-            path = None
+        path = _normalize_path(url) if url else None
 
         if path != "/profile" and error and isinstance(error, urllib3.exceptions.ReadTimeoutError):
             raise error.with_traceback(_stacktrace)
@@ -77,11 +82,50 @@ _profiling_pool = connection_from_url(
         allowed_methods={"GET", "POST"},
     ),
     timeout=10,
-    maxsize=10,
+    maxsize=settings.SENTRY_VROOM_POOL_MAXSIZE,
+    block=False,
     headers={"Accept-Encoding": "br, gzip"},
 )
 
 
+def _is_cacheable_param(value: Any) -> bool:
+    # bools are excluded since the cache would treat True and 1 as the same key
+    if isinstance(value, (list, tuple)):
+        return all(type(v) in (str, int) for v in value)
+    return type(value) in (str, int)
+
+
+@lru_cache(maxsize=256)
+def _cached_urlencode(params: tuple[tuple[str, Any], ...]) -> str:
+    return urlencode(params, doseq=True)
+
+
+def _encode_params(params: dict[Any, Any]) -> str:
+    # do not want to proxy the project_objects to the profiling service
+    # this make the query param unnecessarily large
+    params = {key: value for key, value in params.items() if key != "project_objects"}
+
+    # Only params made of plain strings and ints repeat across requests, anything
+    # else (eg. timestamps, sets or dicts) is encoded directly.
+    if all(isinstance(key, str) and _is_cacheable_param(value) for key, value in params.items()):
+        return _cached_urlencode(
+            tuple(
+                sorted(
+                    (key, tuple(value) if isinstance(value, list) else value)
+                    for key, value in params.items()
+                )
+            )
+        )
+
+    return urlencode(
+        {
+            key: value.isoformat() if isinstance(value, datetime) else value
+            for key, value in params.items()
+        },
+        doseq=True,
+    )
+
+
 def get_from_profiling_service(
     method: str,
     path: str,
@@ -91,14 +135,7 @@ def get_from_profiling_service(
 ) -> VroomResponse:
     kwargs: dict[str, Any] = {"headers": {}}
     if params:
-        params = {
-            key: value.isoformat() if isinstance(value, datetime) else value
-            for key, value in params.items()
-            # do not want to proxy the project_objects to the profiling service
-            # this make the query param unnecessarily large
-            if key != "project_objects"
-        }
-        path = f"{path}?{urlencode(params, doseq=True)}"
+        path = f"{path}?{_encode_params(params)}"
     if headers:
         kwargs["headers"].update(headers)
     if json_data:
@@ -109,7 +146,10 @@ def get_from_profiling_service(
             }
         )
         with sentry_sdk.start_span(op="json.dumps"):
-            data = json.dumps(json_data).encode("utf-8")
+            if options.get("profiling.profiling-service.use-orjson"):
+                data = orjson.dumps(json_data)
+            else:
+                data = json.dumps(json_data).encode("utf-8")
         set_measurement("payload.size", len(data), unit="byte")
         kwargs["body"] = brotli.compress(data, quality=6, mode=brotli.MODE_TEXT)
     return _profiling_pool.urlopen(
@@ -151,7 +191,20 @@ PROFILE_FILTERS = {
 }
 
 
+# Matches a lone `key:value` equality filter whose value cannot carry any
+# operators, wildcards, quoting or lists, so it can skip the full grammar.
+SIMPLE_PROFILE_FILTER_RE = re.compile(r"^([a-z_]+):([\w.\-]+)$")
+
+
 def parse_profile_filters(query: str) -> dict[str, str]:
+    query = query.strip()
+    if not query:
+        return {}
+
+    match = SIMPLE_PROFILE_FILTER_RE.match(query)
+    if match is not None and match.group(1) in PROFILE_FILTERS:
+        return {match.group(1): match.group(2)}
+
     try:
         parsed_terms = parse_search_query(query)
     except ParseError as e:
@@ -164,10 +217,14 @@ def parse_profile_filters(query: str) -> dict[str, str]:
             raise InvalidSearchQuery("Invalid query: Unknown filter")
         if term.operator != "=":  # only support equality filters
             raise InvalidSearchQuery("Invalid query: Illegal operator")
-        if term.key.name not in PROFILE_FILTERS:
-            raise InvalidSearchQuery(f"Invalid query: {term.key.name} is not supported")
-        if term.key.name in profile_filters and term.value.value != profile_filters[term.key.name]:
-            raise InvalidSearchQuery(f"Invalid query: Multiple filters for {term.key.name}")
-        profile_filters[term.key.name] = term.value.value
+        name = term.key.name
+        if name not in PROFILE_FILTERS:
+            raise InvalidSearchQuery(f"Invalid query: {name} is not supported")
+        value = term.value.value
+        try:
+            if profile_filters[name] != value:
+                raise InvalidSearchQuery(f"Invalid query: Multiple filters for {name}")
+        except KeyError:
+            profile_filters[name] = value
 
     return profile_filters
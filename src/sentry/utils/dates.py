@@ -29,6 +29,14 @@ def ensure_aware(value: datetime) -> datetime:
     return make_aware(value)
 
 
+def to_timestamp_ns(value: datetime) -> int:
+    """
+    Converts the datetime to integer nanoseconds since the epoch, without the
+    precision loss of going through a float timestamp.
+    """
+    return (ensure_aware(value) - epoch) // timedelta(microseconds=1) * 1000
+
+
 @overload
 def to_datetime(value: None) -> None:
     ...
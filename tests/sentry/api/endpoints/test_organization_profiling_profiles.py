@@ -7,6 +7,9 @@ from django.urls import reverse
 from rest_framework.exceptions import ErrorDetail
 from snuba_sdk import Column, Condition, Function, Op, Or
 
+from sentry.api.endpoints.organization_profiling_profiles import (
+    OrganizationProfilingFlamegraphEndpoint,
+)
 from sentry.profiles.flamegraph import FlamegraphExecutor
 from sentry.profiles.utils import proxy_profiling_service
 from sentry.snuba.dataset import Dataset
@@ -53,6 +56,42 @@ class OrganizationProfilingFlamegraphTestLegacy(APITestCase):
             ),
         }
 
+    @patch("sentry.api.endpoints.organization_profiling_profiles.proxy_profiling_service")
+    def test_more_than_one_project_param(self, mock_proxy_profiling_service):
+        projects = [
+            self.create_project(),
+            self.create_project(),
+        ]
+        with patch.object(
+            OrganizationProfilingFlamegraphEndpoint, "get_snuba_params"
+        ) as mock_get_snuba_params:
+            response = self.do_request(
+                {
+                    "project": [p.id for p in projects],
+                }
+            )
+        assert response.status_code == 400, response.data
+        assert response.data == {
+            "detail": ErrorDetail(
+                "You cannot get a flamegraph from multiple projects.",
+                code="parse_error",
+            ),
+        }
+        mock_get_snuba_params.assert_not_called()
+        mock_proxy_profiling_service.assert_not_called()
+
+    @patch("sentry.api.endpoints.organization_profiling_profiles.proxy_profiling_service")
+    def test_duplicate_project_param(self, mock_proxy_profiling_service):
+        mock_proxy_profiling_service.return_value = HttpResponse(status=200)
+
+        response = self.do_request(
+            {
+                "project": [self.project.id, self.project.id],
+            }
+        )
+        assert response.status_code == 200, response.content
+        mock_proxy_profiling_service.assert_called_once()
+
     @patch("sentry.search.events.builder.base.raw_snql_query", wraps=raw_snql_query)
     @patch("sentry.api.endpoints.organization_profiling_profiles.proxy_profiling_service")
     def test_queries_functions(self, mock_proxy_profiling_service, mock_raw_snql_query):
@@ -107,6 +146,49 @@ class OrganizationProfilingFlamegraphTestLegacy(APITestCase):
         assert Condition(Column("profile_id"), Op.IS_NOT_NULL) in snql_request.query.where
         assert Condition(Column("transaction"), Op.EQ, "foo") in snql_request.query.where
 
+    @freeze_time("2024-07-05T12:30:00Z")
+    @patch("sentry.search.events.builder.base.raw_snql_query", wraps=raw_snql_query)
+    @patch("sentry.api.endpoints.organization_profiling_profiles.proxy_profiling_service")
+    def test_caches_profile_ids(self, mock_proxy_profiling_service, mock_raw_snql_query):
+        mock_proxy_profiling_service.return_value = HttpResponse(status=200)
+
+        query = {
+            "project": [self.project.id],
+            "query": "transaction:foo",
+            "statsPeriod": "24h",
+        }
+        for _ in range(2):
+            response = self.do_request(query)
+            assert response.status_code == 200, response.content
+
+        mock_raw_snql_query.assert_called_once()
+        assert mock_proxy_profiling_service.call_count == 2
+
+    @freeze_time("2024-07-05T12:30:00Z")
+    @patch("sentry.search.events.builder.base.raw_snql_query", wraps=raw_snql_query)
+    @patch("sentry.api.endpoints.organization_profiling_profiles.proxy_profiling_service")
+    def test_profile_ids_cache_misses(self, mock_proxy_profiling_service, mock_raw_snql_query):
+        mock_proxy_profiling_service.return_value = HttpResponse(status=200)
+        self.create_environment(project=self.project, name="prod")
+
+        base_query = {
+            "project": [self.project.id],
+            "query": "transaction:foo",
+            "statsPeriod": "24h",
+        }
+        for query in [
+            base_query,
+            {**base_query, "query": "transaction:bar"},
+            {**base_query, "environment": "prod"},
+            # unquantized date ranges are never cached
+            {**base_query, "statsPeriod": "1h"},
+            {**base_query, "statsPeriod": "1h"},
+        ]:
+            response = self.do_request(query)
+            assert response.status_code == 200, response.content
+
+        assert mock_raw_snql_query.call_count == 5
+
 
 class OrganizationProfilingFlamegraphTest(ProfilesSnubaTestCase):
     endpoint = "sentry-api-0-organization-profiling-flamegraph"
@@ -163,6 +245,26 @@ class OrganizationProfilingFlamegraphTest(ProfilesSnubaTestCase):
         response = self.do_request({})
         assert response.status_code == 404, response.data
 
+    @patch("sentry.api.endpoints.organization_profiling_profiles.proxy_profiling_service")
+    def test_compat_feature_disabled(self, mock_proxy_profiling_service):
+        mock_proxy_profiling_service.return_value = HttpResponse(status=200)
+
+        response = self.do_request(
+            {"project": [self.project.id]},
+            features={
+                "organizations:profiling": True,
+                "organizations:continuous-profiling-compat": False,
+            },
+        )
+        assert response.status_code == 200, response.content
+
+        # falls back to the legacy per project flamegraph
+        mock_proxy_profiling_service.assert_called_once()
+        assert (
+            mock_proxy_profiling_service.call_args.kwargs["path"]
+            == f"/organizations/{self.organization.id}/projects/{self.project.id}/flamegraph"
+        )
+
     def test_invalid_params(self):
         response = self.do_request(
             {
@@ -198,6 +300,98 @@ class OrganizationProfilingFlamegraphTest(ProfilesSnubaTestCase):
             ),
         }
 
+    def test_negative_fingerprint_invalid(self):
+        response = self.do_request(
+            {
+                "project": [self.project.id],
+                "dataset": "functions",
+                "fingerprint": "-1",
+            },
+        )
+        assert response.status_code == 400, response.content
+        assert response.data == {
+            "fingerprint": [
+                ErrorDetail(
+                    string="Ensure this value is greater than or equal to 0.",
+                    code="min_value",
+                )
+            ],
+        }
+
+    def test_non_integer_fingerprint_invalid(self):
+        response = self.do_request(
+            {
+                "project": [self.project.id],
+                "dataset": "functions",
+                "fingerprint": "abc",
+            },
+        )
+        assert response.status_code == 400, response.content
+        assert response.data == {
+            "fingerprint": [
+                ErrorDetail(string="A valid integer is required.", code="invalid"),
+            ],
+        }
+
+    def test_fingerprint_too_long_invalid(self):
+        response = self.do_request(
+            {
+                "project": [self.project.id],
+                "dataset": "functions",
+                "fingerprint": "1" * 1001,
+            },
+        )
+        assert response.status_code == 400, response.content
+        assert response.data == {
+            "fingerprint": [
+                ErrorDetail(string="String value too large.", code="max_string_length"),
+            ],
+        }
+
+    def test_query_with_null_characters_invalid(self):
+        response = self.do_request(
+            {
+                "project": [self.project.id],
+                "query": "transaction:foo\x00",
+            },
+        )
+        assert response.status_code == 400, response.content
+        assert response.data == {
+            "query": [
+                ErrorDetail(
+                    string="Null characters are not allowed.",
+                    code="null_characters_not_allowed",
+                ),
+            ],
+        }
+
+    @patch("sentry.search.events.builder.base.raw_snql_query", wraps=raw_snql_query)
+    @patch("sentry.api.endpoints.organization_profiling_profiles.proxy_profiling_service")
+    def test_fingerprint_with_trailing_zero_decimal(
+        self, mock_proxy_profiling_service, mock_raw_snql_query
+    ):
+        mock_proxy_profiling_service.return_value = HttpResponse(status=200)
+
+        response = self.do_request(
+            {
+                "project": [self.project.id],
+                "dataset": "functions",
+                "fingerprint": "5.0",
+            },
+        )
+        assert response.status_code == 200, response.content
+
+        mock_raw_snql_query.assert_called_once()
+        snql_request = mock_raw_snql_query.call_args.args[0]
+        assert (
+            Condition(
+                Function("toUInt32", [Column("fingerprint")], "fingerprint"),
+                Op.EQ,
+                5,
+            )
+            in snql_request.query.where
+        )
+
     def test_queries_profile_candidates_from_functions(self):
         fingerprint = int(uuid4().hex[:8], 16)
 
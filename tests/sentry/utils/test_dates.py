@@ -1,6 +1,11 @@
 import datetime
 
-from sentry.utils.dates import date_to_utc_datetime, parse_stats_period, parse_timestamp
+from sentry.utils.dates import (
+    date_to_utc_datetime,
+    parse_stats_period,
+    parse_timestamp,
+    to_timestamp_ns,
+)
 
 
 def test_parse_stats_period():
@@ -20,6 +25,12 @@ def test_date_to_utc_datetime():
     assert dt == datetime.datetime(2024, 7, 5, tzinfo=datetime.UTC)
 
 
+def test_to_timestamp_ns():
+    dt = datetime.datetime(2024, 7, 5, 12, 30, 15, 123456, tzinfo=datetime.UTC)
+    assert to_timestamp_ns(dt) == 1720182615123456000
+    assert to_timestamp_ns(dt.replace(tzinfo=None)) == 1720182615123456000
+
+
 def test_parse_timestamp():
     assert parse_timestamp("2024-05-20T17:29:00+00:00") == datetime.datetime(
         2024, 5, 20, 17, 29, tzinfo=datetime.UTC
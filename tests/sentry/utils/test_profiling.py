@@ -1,7 +1,9 @@
+from datetime import UTC, datetime
+
 import pytest
 
 from sentry.exceptions import InvalidSearchQuery
-from sentry.profiles.utils import parse_profile_filters
+from sentry.profiles.utils import _cached_urlencode, _encode_params, parse_profile_filters
 
 
 @pytest.mark.parametrize(
@@ -26,7 +28,10 @@ def test_parse_profiling_filters_errors(query, error):
     "query, expected",
     [
         pytest.param("", {}, id="empty query"),
+        pytest.param("   ", {}, id="blank query"),
         pytest.param("android_api_level:1", {"android_api_level": "1"}, id="one filter"),
+        pytest.param("device_locale:en-US", {"device_locale": "en-US"}, id="one simple filter"),
+        pytest.param('device_model:"Pixel 7"', {"device_model": "Pixel 7"}, id="one quoted filter"),
         pytest.param(
             "android_api_level:1 device_classification:high",
             {"android_api_level": "1", "device_classification": "high"},
@@ -46,3 +51,41 @@ def test_parse_profiling_filters_errors(query, error):
 )
 def test_parse_profiling_filters(query, expected):
     assert parse_profile_filters(query) == expected
+
+
+@pytest.mark.parametrize(
+    "params, expected",
+    [
+        pytest.param({"format": "sample"}, "format=sample", id="string"),
+        pytest.param(
+            {"project_id": [2, 1], "format": "sample"},
+            "format=sample&project_id=2&project_id=1",
+            id="list",
+        ),
+        pytest.param(
+            {"start": datetime(2024, 7, 5, 12, 30, tzinfo=UTC), "project_id": [1]},
+            "start=2024-07-05T12%3A30%3A00%2B00%3A00&project_id=1",
+            id="datetime",
+        ),
+        pytest.param({"environment": {"prod"}}, "environment=prod", id="set"),
+        pytest.param({"flag": True}, "flag=True", id="bool"),
+        pytest.param({"flag": 1}, "flag=1", id="int"),
+        pytest.param(
+            {"format": "sample", "project_objects": [object()]},
+            "format=sample",
+            id="project objects",
+        ),
+    ],
+)
+def test_encode_params(params, expected):
+    assert _encode_params(params) == expected
+
+
+def test_encode_params_caches_plain_params():
+    _cached_urlencode.cache_clear()
+    _encode_params({"format": "sample", "project_id": [1]})
+    _encode_params({"project_id": [1], "format": "sample"})
+    _encode_params({"start": datetime(2024, 7, 5, tzinfo=UTC)})
+    _encode_params({"flag": True})
+    info = _cached_urlencode.cache_info()
+    assert (info.hits, info.misses) == (1, 1)